@@ -16,6 +16,9 @@ class CheckAnomaly(BaseCheck):
     def execute_query(self, q: Select, verbose: bool = False) -> Any:
         return self.metric_store.execute_query(q, self.check, verbose)
 
+    def execute_query_df(self, q: Select, verbose: bool = False) -> pd.DataFrame:
+        return self.metric_store.execute_query_df(q, self.check, verbose)
+
     def run(self, verbose: bool) -> List[Any]:
         datasets = self.check.dataset
         results = []
@@ -24,38 +27,32 @@ class CheckAnomaly(BaseCheck):
         for dataset in datasets:
             exp = self.parse_dataset(dataset)
             q = self.get_query(exp, verbose)
-            result_windows = self.execute_query(q, verbose)
+            # Windows stay columnar, no Python tuple per metric row
+            all_results = self.execute_query_df(q, verbose)
             if self.check.dimensions:
                 dim = self.check.dimensions[0]
-                all_results = pd.DataFrame(
-                    result_windows, columns=[dim, "actual_value", "run_time"]
-                )
-                unique_dim_values = all_results[dim].unique()
-                result_windows = []
-                for dim_value in unique_dim_values:
-                    all_results_dim = all_results[all_results[dim] == dim_value]
-                    result_windows.append(
-                        (
-                            dim_value,
-                            all_results_dim[
-                                ["actual_value", "run_time"]
-                            ].values.tolist(),
-                        )
+                all_results.columns = [dim, "actual_value", "run_time"]
+                result_windows = [
+                    (dim_value, all_results_dim[["actual_value", "run_time"]])
+                    for dim_value, all_results_dim in all_results.groupby(
+                        dim, sort=False, dropna=False
                     )
+                ]
 
             else:
-                result_windows = [(None, result_windows)]
+                all_results.columns = ["actual_value", "run_time"]
+                result_windows = [(None, all_results)]
 
-            for dim_value, result_window in result_windows:
-
-                results_df = pd.DataFrame(
-                    result_window, columns=["actual_value", "run_time"]
-                )
+            for dim_value, results_df in result_windows:
 
-                if len(result_window) < 5:
+                if len(results_df) < 5:
                     actual_value = (
-                        result_window[-1][0] if len(result_window) > 0 else None
+                        results_df["actual_value"].iloc[-1]
+                        if len(results_df) > 0
+                        else None
                     )
+                    if pd.isna(actual_value):
+                        actual_value = None
                     if dim_value:
                         result_value = [dim_value, actual_value]
                     else:
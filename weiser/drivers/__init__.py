@@ -1,4 +1,5 @@
-from typing import Union
+from functools import lru_cache
+from typing import Dict, List, Union
 
 from weiser.loader.models import Datasource, DBType
 from weiser.drivers.base import BaseDriver
@@ -13,6 +14,18 @@ DBDriverType = Union[BaseDriver, PostgresDriver]
 
 
 class DriverFactory:
+    # Datasources are frozen and hash by value, a process that loads the same
+    # config again reuses the driver and its warm connection pool.
     @staticmethod
+    @lru_cache(maxsize=None)
     def create_driver(data_source: Datasource) -> DBDriverType:
         return DB_DRIVER_MAP.get(data_source.type, BaseDriver)(data_source)
+
+    # Drivers keyed by datasource name. Engines connect lazily, building them
+    # is cheap and needs no concurrency.
+    @staticmethod
+    def create_drivers(data_sources: List[Datasource]) -> Dict[str, DBDriverType]:
+        return {
+            data_source.name: DriverFactory.create_driver(data_source)
+            for data_source in data_sources
+        }
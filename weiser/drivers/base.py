@@ -1,5 +1,7 @@
+from functools import lru_cache
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import URL
+from sqlalchemy.sql.elements import TextClause
 from pprint import pprint
 from typing import Any, List
 
@@ -26,7 +28,7 @@ from sqlglot.dialects import (
     Teradata,
     Trino,
 )
-from sqlglot.expressions import Select
+from sqlglot.expressions import Expression, Select
 
 from weiser.loader.models import Datasource, DBType
 
@@ -40,10 +42,23 @@ DIALECT_TYPE_MAP = {
 }
 
 
+@lru_cache(maxsize=2048)
+def cached_text(sql: str) -> TextClause:
+    # Reuse the TextClause for repeated SQL strings, skipping bind param parsing.
+    return text(sql)
+
+
+@lru_cache(maxsize=256)
+def cached_sql(q: Expression, dialect: Any) -> str:
+    # Render each distinct query once per dialect, repeated checks reuse the string.
+    return q.sql(dialect=dialect)
+
+
 class BaseDriver:
     def __init__(self, data_source: Datasource) -> None:
-        if not data_source.uri:
-            data_source.uri = URL.create(
+        uri = data_source.uri
+        if not uri:
+            uri = URL.create(
                 (
                     data_source.type
                     if data_source.type != DBType.cube
@@ -56,13 +71,13 @@ class BaseDriver:
             )
 
         self.data_source = data_source
-        self.engine = create_engine(data_source.uri)
+        self.engine = create_engine(uri)
         self.dialect = DIALECT_TYPE_MAP.get(data_source.type, Dialect)()
 
     def execute_query(self, q: Select, check: Any, verbose: bool = False) -> List[Any]:
         engine = self.engine
         with engine.connect() as conn:
-            rows = list(conn.execute(text(q.sql(dialect=self.dialect))))
+            rows = list(conn.execute(cached_text(cached_sql(q, self.dialect))))
             if not len(rows) > 0 and not len(rows[0]) > 0 and not rows[0][0] is None:
                 raise Exception(
                     f"Unexpected result executing check: {check.model_dump()}"
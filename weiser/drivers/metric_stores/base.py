@@ -0,0 +1,79 @@
+import threading
+
+from operator import itemgetter
+from typing import List, Tuple, Union
+
+# Pending records are written in a single statement once this many accumulate.
+INSERT_BATCH_SIZE = 1000
+
+# Columns of the metrics table, in table order. Buffered rows are tuples in
+# this order.
+METRICS_COLUMNS = [
+    "actual_value",
+    "check_id",
+    "condition",
+    "dataset",
+    "datasource",
+    "fail",
+    "name",
+    "run_id",
+    "run_time",
+    "sql",
+    "success",
+    "threshold",
+    "threshold_list",
+    "type",
+]
+
+# Result records carry the check sql under the measure key.
+record_to_row = itemgetter(
+    *("measure" if column == "sql" else column for column in METRICS_COLUMNS)
+)
+
+
+class BaseMetricStore:
+    def __init__(self) -> None:
+        self._pending = []
+        # Checks run concurrently, the insert buffer is shared between them.
+        self._lock = threading.RLock()
+
+    def insert_results(self, records: Union[dict, List[dict]]):
+        if isinstance(records, dict):
+            records = [records]
+        rows = []
+        for record in records:
+            if isinstance(record["threshold"], List) or isinstance(
+                record["threshold"], Tuple
+            ):
+                record["threshold_list"] = record["threshold"]
+                record["threshold"] = None
+            elif "threshold_list" not in record:
+                record["threshold_list"] = None
+            try:
+                rows.append(record_to_row(record))
+            except KeyError as e:
+                # Caught here, a malformed row would fail the whole batch later.
+                raise Exception(
+                    f"Result record is missing metrics column {e}: {record}"
+                ) from e
+        with self._lock:
+            self._pending.extend(rows)
+            if len(self._pending) >= INSERT_BATCH_SIZE:
+                self.flush()
+
+    # Write buffered records in one transaction
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            # The buffer is taken before writing, a bad row fails this flush
+            # only instead of every later flush, query and export.
+            pending, self._pending = self._pending, []
+            self.write_rows(pending)
+
+    # Stores that export in the background block here until it is done
+    def wait_for_export(self):
+        pass
+
+    def write_rows(self, rows: List[tuple]):
+        raise Exception("Write Rows Method Not Implemented Yet")
@@ -1,88 +1,376 @@
-import boto3
+import atexit
 import duckdb
+import os
+import pandas as pd
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from operator import itemgetter
 from rich import print
-from typing import List, Tuple, Any
+from typing import Iterator, List, Any
 
-from sqlglot.expressions import insert, values, Select
+from sqlglot.expressions import Select
 from sqlglot.dialects import DuckDB
+from weiser.drivers.base import cached_sql
+from weiser.drivers.metric_stores.base import (
+    INSERT_BATCH_SIZE,
+    METRICS_COLUMNS,
+    BaseMetricStore,
+)
 from weiser.loader.models import MetricStore, S3UrlStyle
 
+# Per-run parquet files are merged into one once more than this many accumulate.
+COMPACTION_THRESHOLD = 50
 
-class DuckDBMetricStore:
+# A run's rows are exported as a single file, usually a single row group.
+RUN_ROW_GROUP_SIZE = 100000
+
+# Compacted history is written in large row groups, it is only ever scanned.
+COMPACTED_ROW_GROUP_SIZE = 1000000
+
+# S3 returns and deletes at most this many keys per request.
+S3_BATCH_SIZE = 1000
+
+# Concurrent S3 requests issued by bulk operations.
+S3_MAX_WORKERS = 32
+
+# DuckDB types of the metrics columns.
+METRICS_COLUMN_TYPES = {
+    "actual_value": "DOUBLE",
+    "check_id": "VARCHAR",
+    "condition": "VARCHAR",
+    "dataset": "VARCHAR",
+    "datasource": "VARCHAR",
+    "fail": "BOOLEAN",
+    "name": "VARCHAR",
+    "run_id": "VARCHAR",
+    "run_time": "TIMESTAMP",
+    "sql": "VARCHAR",
+    "success": "BOOLEAN",
+    "threshold": "VARCHAR",
+    "threshold_list": "DOUBLE[]",
+    "type": "VARCHAR",
+}
+
+row_run_time = itemgetter(METRICS_COLUMNS.index("run_time"))
+
+CREATE_TABLE_QUERY = "CREATE TABLE IF NOT EXISTS metrics ({})".format(
+    ", ".join(f"{column} {METRICS_COLUMN_TYPES[column]}" for column in METRICS_COLUMNS)
+)
+
+ROW_PLACEHOLDERS = "({})".format(", ".join("?" for _ in METRICS_COLUMNS))
+
+
+# Multi-row INSERT, a whole batch is parsed and executed as one statement
+@lru_cache(maxsize=16)
+def insert_query(row_count: int) -> str:
+    return "INSERT INTO metrics VALUES " + ", ".join([ROW_PLACEHOLDERS] * row_count)
+
+
+HTTPFS_STATUS_QUERY = (
+    "SELECT installed, loaded FROM duckdb_extensions() "
+    "WHERE extension_name = 'httpfs'"
+)
+
+PARQUET_COLUMNS_QUERY = (
+    "DESCRIBE SELECT * FROM read_parquet(?, union_by_name = true)"
+)
+
+KNOWN_RUN_IDS_QUERY = (
+    "SELECT DISTINCT run_id FROM metrics WHERE list_contains(?, run_id)"
+)
+
+# Failed checks reported in detail by an export.
+MAX_EXPORTED_FAILURES = 20
+
+# Summary statistics and detailed failure information for a run,
+# computed from a single scan of its rows. Failures come back already shaped as
+# structs, which DuckDB hands over as dicts.
+EXPORT_QUERY = f"""
+    WITH run AS (
+        SELECT * FROM metrics WHERE run_id = ?
+    ),
+    failures AS (
+        SELECT
+            struct_pack(
+                name := name,
+                dataset := dataset,
+                datasource := datasource,
+                check_id := check_id,
+                condition := condition,
+                actual_value := actual_value,
+                threshold := threshold,
+                type := type
+            ) AS failure
+        FROM run
+        WHERE NOT success
+        LIMIT {MAX_EXPORTED_FAILURES}
+    )
+    SELECT
+        COUNT(*) as total_checks,
+        COUNT(*) FILTER (WHERE success) as passed_checks,
+        (SELECT list(failure) FROM failures) as failures
+    FROM run
+"""
+
+
+# Stores still open at exit are closed then, flushing buffered metrics. The set
+# holds weak references, so stores the caller drops are collected and closed.
+OPEN_STORES = weakref.WeakSet()
+
+
+@atexit.register
+def close_open_stores():
+    for store in list(OPEN_STORES):
+        store.close()
+
+
+class DuckDBMetricStore(BaseMetricStore):
     def __init__(self, config: MetricStore) -> None:
+        super().__init__()
         self.config = config
-        self.s3_client = boto3.client(
+        self.db_name = config.db_name
+        self.dialect = DuckDB
+        self._import_future = None
+        self._export_future = None
+        if not self.db_name:
+            self.db_name = "./metricstore.db"
+        # S3 settings are literals DuckDB can't bind, build them once per store.
+        # Local only stores never load httpfs.
+        self.s3_settings = self.build_s3_settings() if self.has_s3_config() else []
+        self._s3_configured = False
+        # One connection for the life of the store, threads get cursors on it.
+        self._conn = duckdb.connect(self.db_name)
+        self._local = threading.local()
+        OPEN_STORES.add(self)
+        conn = self.conn
+        self.configure_s3(conn)
+        conn.sql(CREATE_TABLE_QUERY)
+        # Export and backfill look rows up by run id, anomaly checks by check id.
+        conn.sql("CREATE INDEX IF NOT EXISTS idx_metrics_run_id ON metrics (run_id)")
+        conn.sql(
+            "CREATE INDEX IF NOT EXISTS idx_metrics_check_id ON metrics (check_id)"
+        )
+        if self.has_s3_config():
+            # Backfill from S3 in the background, the local schema is ready and
+            # checks can start querying data sources meanwhile.
+            executor = ThreadPoolExecutor(max_workers=1)
+            self._import_future = executor.submit(self.import_s3_data)
+            executor.shutdown(wait=False)
+
+    # Block until the S3 backfill is done, before the first access to metrics
+    def wait_for_import(self):
+        if self._import_future is not None:
+            future, self._import_future = self._import_future, None
+            future.result()
+
+    # Block until the last S3 upload is done
+    def wait_for_export(self):
+        if self._export_future is not None:
+            future, self._export_future = self._export_future, None
+            future.result()
+
+    # The local DuckDB file is the primary store, S3 only backfills runs
+    # that were exported from somewhere else. Files written with an older
+    # schema are unioned by name, missing columns come back as NULL.
+    def import_s3_data(self):
+        conn = self.conn
+        keys = self.list_parquet_files("metrics/")
+        if not keys:
+            return
+        run_ids = [key[len("metrics/") : -len(".parquet")] for key in keys]
+        known_run_ids = {
+            row[0]
+            for row in conn.execute(KNOWN_RUN_IDS_QUERY, [run_ids]).fetchall()
+        }
+        missing_files = [
+            f"s3://{self.config.s3_bucket}/{key}"
+            for key, run_id in zip(keys, run_ids)
+            if run_id not in known_run_ids
+        ]
+        if not missing_files:
+            return
+        # Only columns the table knows are read, the file schemas come from
+        # the parquet footers. Compacted files mix runs, rows of runs already
+        # stored locally are skipped by run id, whatever their run time.
+        file_columns = conn.execute(PARQUET_COLUMNS_QUERY, [missing_files]).fetchall()
+        columns = ", ".join(
+            column for column, *_ in file_columns if column in METRICS_COLUMN_TYPES
+        )
+        conn.execute(
+            f"INSERT INTO metrics BY NAME SELECT {columns} FROM read_parquet(?, "
+            "hive_partitioning = false, filename = false, union_by_name = true) "
+            "WHERE run_id NOT IN (SELECT DISTINCT run_id FROM metrics)",
+            [missing_files],
+        )
+
+    @property
+    def conn(self) -> duckdb.DuckDBPyConnection:
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self._conn.cursor()
+        return cursor
+
+    def has_s3_config(self) -> bool:
+        return bool(self.config.s3_bucket)
+
+    # boto3 is only imported and built for stores that actually talk to S3
+    @cached_property
+    def s3_client(self):
+        import boto3
+        from botocore.config import Config
+
+        return boto3.client(
             "s3",
             region_name=self.config.s3_region,
             aws_access_key_id=self.config.s3_access_key,
             aws_secret_access_key=self.config.s3_secret_access_key,
+            config=Config(
+                max_pool_connections=64,
+                retries={"mode": "adaptive", "max_attempts": 10},
+                tcp_keepalive=True,
+            ),
         )
-        self.db_name = config.db_name
-        self.dialect = DuckDB
-        if not self.db_name:
-            self.db_name = "./metricstore.db"
-        with duckdb.connect(self.db_name) as conn:
-            conn.sql("INSTALL httpfs;")
-            conn.sql("LOAD httpfs;")
-            if self.config.s3_url_style == S3UrlStyle.path:
-                conn.sql(f"SET s3_url_style='{self.config.s3_url_style}'")
-            elif self.config.s3_url_style == S3UrlStyle.vhost:
-                conn.sql(f"SET s3_region = '{self.config.s3_region}'")
-            if self.config.s3_endpoint:
-                conn.sql(f"SET s3_endpoint = '{self.config.s3_endpoint}'")
-            conn.sql(f"SET s3_access_key_id = '{self.config.s3_access_key}'")
-            conn.sql(f"SET s3_secret_access_key = '{self.config.s3_secret_access_key}'")
-            conn.sql(
-                """CREATE TABLE IF NOT EXISTS metrics (
-                     actual_value DOUBLE,
-                     check_id VARCHAR,
-                     condition VARCHAR,
-                     dataset VARCHAR,
-                     datasource VARCHAR,
-                     fail BOOLEAN,
-                     name VARCHAR,
-                     run_id VARCHAR,
-                     run_time TIMESTAMP,
-                     sql VARCHAR,
-                     success boolean,
-                     threshold VARCHAR,
-                     threshold_list DOUBLE[],
-                     type VARCHAR
-                     )"""
+
+    def close(self):
+        if getattr(self, "_conn", None) is not None:
+            OPEN_STORES.discard(self)
+            try:
+                self.flush()
+                self.wait_for_export()
+            finally:
+                self._conn.close()
+                self._conn = None
+
+    def __del__(self):
+        self.close()
+
+    def build_s3_settings(self) -> List[str]:
+        settings = [
+            # Parquet scans over S3 are network bound, oversubscribe threads
+            # so more range requests are in flight.
+            f"SET GLOBAL threads = {(os.cpu_count() or 1) * 2}",
+            "SET GLOBAL http_retries = 3",
+            "SET GLOBAL http_timeout = 30000",
+            "SET GLOBAL s3_uploader_max_parts_per_file = 10000",
+            "SET GLOBAL enable_http_metadata_cache = true",
+            "SET GLOBAL preserve_insertion_order = false",
+        ]
+        if self.config.s3_url_style == S3UrlStyle.path:
+            settings.append(
+                f"SET GLOBAL s3_url_style='{self.config.s3_url_style}'"
+            )
+        elif self.config.s3_url_style == S3UrlStyle.vhost:
+            settings.append(f"SET GLOBAL s3_region = '{self.config.s3_region}'")
+        if self.config.s3_endpoint:
+            settings.append(
+                f"SET GLOBAL s3_endpoint = '{self.config.s3_endpoint}'"
+            )
+        # Only configured credentials are set, a literal 'None' key would
+        # shadow credentials DuckDB picks up from the environment.
+        if self.config.s3_access_key:
+            settings.append(
+                f"SET GLOBAL s3_access_key_id = '{self.config.s3_access_key}'"
             )
-            res = conn.sql(
-                """SELECT MAX(run_time) AS run_time FROM metrics"""
-            ).fetchall()
-            last_run_time = "1=1"
-            if res and res[0][0]:
-                last_run_time = f"run_time > '{res[0][0]}'"
-            conn.sql(
-                f"""
-                INSERT INTO metrics SELECT * FROM 's3://{self.config.s3_bucket}/metrics/*.parquet' WHERE {last_run_time};
-                """
+        if self.config.s3_secret_access_key:
+            settings.append(
+                "SET GLOBAL s3_secret_access_key = "
+                f"'{self.config.s3_secret_access_key}'"
+            )
+        return settings
+
+    # Settings are global to the database instance, so every cursor sees them
+    # once they are applied.
+    def configure_s3(self, conn: duckdb.DuckDBPyConnection):
+        if self._s3_configured or not self.has_s3_config():
+            return
+        # INSTALL reads the extension repository metadata even when the
+        # extension is there already, only install and load what's missing.
+        installed, loaded = conn.execute(HTTPFS_STATUS_QUERY).fetchone()
+        if not installed:
+            conn.sql("INSTALL httpfs")
+        if not loaded:
+            conn.sql("LOAD httpfs")
+        for statement in self.s3_settings:
+            conn.sql(statement)
+        self._s3_configured = True
+
+    # COPY targets can't be parameters, quote them as SQL string literals
+    def s3_url_literal(self, key) -> str:
+        url = f"s3://{self.config.s3_bucket}/{key}"
+        return "'{}'".format(url.replace("'", "''"))
+
+    # Parquet keys under prefix, one list per S3 listing page
+    def iter_parquet_pages(self, prefix) -> Iterator[List[str]]:
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=self.config.s3_bucket,
+            Prefix=prefix,
+            PaginationConfig={"PageSize": S3_BATCH_SIZE},
+        ):
+            yield [
+                obj["Key"]
+                for obj in page.get("Contents", [])
+                if obj["Key"].endswith(".parquet")
+            ]
+
+    # List Parquet files
+    def list_parquet_files(self, prefix) -> List[str]:
+        return [key for page in self.iter_parquet_pages(prefix) for key in page]
+
+    # Delete up to S3_BATCH_SIZE keys in a single request
+    def delete_objects(self, keys: List[str]):
+        response = self.s3_client.delete_objects(
+            Bucket=self.config.s3_bucket,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+        # Batch deletes report per-key failures instead of raising.
+        errors = response.get("Errors", [])
+        if errors:
+            raise Exception(
+                f"Failed deleting {len(errors)} S3 objects: "
+                f"{', '.join(error['Key'] for error in errors[:10])}"
             )
 
     # Delete Parquet files
     def delete_parquet_files(self, prefix):
-        bucket_name = self.config.s3_bucket
-        response = self.s3_client.list_objects_v2(Bucket=bucket_name, Prefix=prefix)
-
-        if "Contents" in response:
-            for obj in response["Contents"]:
-                if obj["Key"].endswith(".parquet"):
-                    self.s3_client.delete_object(Bucket=bucket_name, Key=obj["Key"])
-                    # print(f"Deleted {obj['Key']}")
-
-    # Move Parquet files
-    def move_file(self, source_key, destination_key):
-        bucket_name = self.config.s3_bucket
-        copy_source = {"Bucket": bucket_name, "Key": source_key}
-        # Copy the file to the new location
-        self.s3_client.copy_object(
-            CopySource=copy_source, Bucket=bucket_name, Key=destination_key
+        # Pages are deleted as soon as they are listed, so deletes overlap with
+        # fetching the next page. A page never exceeds the batch delete limit.
+        with ThreadPoolExecutor(max_workers=S3_MAX_WORKERS) as pool:
+            futures = [
+                pool.submit(self.delete_objects, keys)
+                for keys in self.iter_parquet_pages(prefix)
+                if keys
+            ]
+            for future in futures:
+                future.result()
+
+    # Delete the given keys, in concurrent batch requests
+    def delete_keys(self, keys: List[str]):
+        with ThreadPoolExecutor(max_workers=S3_MAX_WORKERS) as pool:
+            futures = [
+                pool.submit(self.delete_objects, keys[i : i + S3_BATCH_SIZE])
+                for i in range(0, len(keys), S3_BATCH_SIZE)
+            ]
+            for future in futures:
+                future.result()
+
+    # Merge the given run files into a single parquet file, sorted by run_time
+    # so row group stats prune time filtered scans.
+    def compact_parquet_files(self, run_id, keys: List[str]):
+        # The merged file is written straight to its final key, which never
+        # matches a run id so imports always read it. Only the files it was
+        # built from are deleted afterwards.
+        self.conn.execute(
+            "COPY (SELECT * FROM read_parquet(?, union_by_name = true) "
+            "ORDER BY run_time) "
+            f"TO {self.s3_url_literal(f'metrics/merged_at_{run_id}.parquet')} "
+            f"(FORMAT 'parquet', COMPRESSION 'zstd', "
+            f"ROW_GROUP_SIZE {COMPACTED_ROW_GROUP_SIZE})",
+            [[f"s3://{self.config.s3_bucket}/{key}" for key in keys]],
         )
-        # Delete the original file
-        self.s3_client.delete_object(Bucket=bucket_name, Key=source_key)
+        self.delete_keys(keys)
 
     # Meant for metadata queries, like anomaly detection
     def execute_query(
@@ -92,133 +380,114 @@ class DuckDBMetricStore:
         verbose: bool = False,
         validate_results: bool = True,
     ):
-        with duckdb.connect(self.db_name) as conn:
-            rows = conn.sql(q.sql(dialect=self.dialect)).fetchall()
-            if validate_results and not len(rows) > 0:
-                if verbose:
-                    print(q.sql(dialect=self.dialect))
-                raise Exception(
-                    f"Unexpected result executing check: {check.model_dump()}"
-                )
+        self.flush()
+        conn = self.conn
+        rows = conn.sql(cached_sql(q, self.dialect)).fetchall()
+        if validate_results and not len(rows) > 0:
             if verbose:
-                # pprint(rows)
-                pass
+                print(cached_sql(q, self.dialect))
+            raise Exception(
+                f"Unexpected result executing check: {check.model_dump()}"
+            )
+        if verbose:
+            # pprint(rows)
+            pass
         return rows
 
-    def insert_results(self, record):
-        with duckdb.connect(self.db_name) as conn:
-            if isinstance(record["threshold"], List) or isinstance(
-                record["threshold"], Tuple
-            ):
-                record["threshold_list"] = record["threshold"]
-                record["threshold"] = None
-            elif "threshold_list" not in record:
-                record["threshold_list"] = None
-            q = insert(
-                values(
-                    [
-                        (
-                            record["actual_value"],
-                            record["check_id"],
-                            record["condition"],
-                            record["dataset"],
-                            record["datasource"],
-                            record["fail"],
-                            record["name"],
-                            record["run_id"],
-                            record["run_time"],
-                            record["measure"],
-                            record["success"],
-                            record["threshold"],
-                            record["threshold_list"],
-                            record["type"],
-                        )
-                    ]
-                ),
-                "metrics",
+    # Columnar variant of execute_query, rows go straight into a DataFrame
+    def execute_query_df(
+        self,
+        q: Select,
+        check: Any,
+        verbose: bool = False,
+    ) -> pd.DataFrame:
+        self.flush()
+        # fetchall + description instead of .df(), DuckDB 0.9's numpy
+        # conversion is not compatible with numpy 2.
+        result = self.conn.execute(cached_sql(q, self.dialect))
+        df = pd.DataFrame(
+            result.fetchall(), columns=[column[0] for column in result.description]
+        )
+        if df.empty:
+            if verbose:
+                print(cached_sql(q, self.dialect))
+            raise Exception(
+                f"Unexpected result executing check: {check.model_dump()}"
             )
-            conn.sql(q.sql(dialect="duckdb"))
+        return df
+
+    def flush(self):
+        self.wait_for_import()
+        super().flush()
+
+    # Write rows in one multi-row statement per batch, in one transaction
+    def write_rows(self, rows: List[tuple]):
+        # Insert in run_time order so row group zone maps stay selective.
+        rows.sort(key=row_run_time)
+        conn = self.conn
+        conn.begin()
+        try:
+            for i in range(0, len(rows), INSERT_BATCH_SIZE):
+                batch = rows[i : i + INSERT_BATCH_SIZE]
+                conn.execute(
+                    insert_query(len(batch)), [value for row in batch for value in row]
+                )
+            conn.commit()
+        except Exception:
+            # An aborted transaction would reject every later statement.
+            conn.rollback()
+            raise
+
+    # Write a run to S3 as its own parquet file
+    def upload_run(self, run_id):
+        # COPY targets can't be bound, only the run filter is a parameter and
+        # the target is quoted as a literal.
+        # Sorted so the repetitive dataset and check id strings dictionary
+        # encode into long runs.
+        self.conn.execute(
+            "COPY (SELECT * FROM metrics WHERE run_id = ? "
+            "ORDER BY dataset, check_id, run_time) "
+            f"TO {self.s3_url_literal(f'metrics/{run_id}.parquet')} "
+            f"(FORMAT 'parquet', COMPRESSION 'zstd', "
+            f"ROW_GROUP_SIZE {RUN_ROW_GROUP_SIZE})",
+            [run_id],
+        )
+        # Runs are appended as their own file, history is only rewritten
+        # when enough small files pile up.
+        keys = self.list_parquet_files("metrics/")
+        if len(keys) > COMPACTION_THRESHOLD:
+            self.compact_parquet_files(run_id, keys)
 
     def export_results(self, run_id):
+        self.flush()
         # First get the results
         results = {
             'summary': {},
             'failures': []
         }
         
-        with duckdb.connect(self.db_name) as conn:
-            # Get summary statistics
-            summary_query = f"""
-                SELECT 
-                    COUNT(*) as total_checks,
-                    SUM(CASE WHEN success THEN 1 ELSE 0 END) as passed_checks,
-                    SUM(CASE WHEN NOT success THEN 1 ELSE 0 END) as failed_checks
-                FROM metrics 
-                WHERE run_id = '{run_id}'
-            """
-            summary_results = conn.sql(summary_query).fetchone()
-            results['summary'] = {
-                'total_checks': summary_results[0],
-                'passed_checks': summary_results[1],
-                'failed_checks': summary_results[2]
-            }
-            
-            # Get detailed failure information (max 20 rows)
-            failures_query = f"""
-                SELECT 
-                    name,
-                    dataset,
-                    datasource,
-                    check_id,
-                    condition,
-                    actual_value,
-                    threshold,
-                    type
-                FROM metrics 
-                WHERE run_id = '{run_id}' 
-                    AND NOT success 
-                LIMIT 20
-            """
-            failure_results = conn.sql(failures_query).fetchall()
-            columns = ['name', 'dataset', 'datasource', 'check_id', 'condition', 'actual_value', 'threshold', 'type']
-            
-            for row in failure_results:
-                failure_dict = {col: val for col, val in zip(columns, row)}
-                results['failures'].append(failure_dict)
+        conn = self.conn
+        summary_results = conn.execute(EXPORT_QUERY, [run_id]).fetchone()
+        # Get summary statistics, every check that didn't pass failed
+        results['summary'] = {
+            'total_checks': summary_results[0],
+            'passed_checks': summary_results[1],
+            'failed_checks': summary_results[0] - summary_results[1]
+        }
+        
+        # Get detailed failure information
+        results['failures'] = summary_results[2] or []
         
 
         # Now handle S3 export if configured
-        if (
-            self.config.s3_bucket
-            and self.config.s3_access_key
-            and self.config.s3_secret_access_key
-        ):
-            with duckdb.connect(self.db_name) as conn:
-                conn.sql("INSTALL httpfs;")
-                conn.sql("LOAD httpfs;")
-                if self.config.s3_url_style == S3UrlStyle.path:
-                    conn.sql(f"SET s3_url_style='{self.config.s3_url_style}'")
-                elif self.config.s3_url_style == S3UrlStyle.vhost:
-                    conn.sql(f"SET s3_region = '{self.config.s3_region}'")
-                if self.config.s3_endpoint:
-                    conn.sql(f"SET s3_endpoint = '{self.config.s3_endpoint}'")
-                conn.sql(f"SET s3_access_key_id = '{self.config.s3_access_key}'")
-                conn.sql(f"SET s3_secret_access_key = '{self.config.s3_secret_access_key}'")
-                conn.sql(
-                    f"COPY (SELECT * FROM metrics WHERE run_id='{run_id}') TO 's3://{self.config.s3_bucket}/metrics/{run_id}.parquet' (FORMAT 'parquet');"
-                )
-                conn.sql(
-                    f"""
-                        COPY (SELECT * FROM 's3://{self.config.s3_bucket}/metrics/*.parquet') TO 's3://{self.config.s3_bucket}/tmp/merged_at_{run_id}.parquet' (FORMAT 'parquet');
-                    """
-                )
-                # Delete old Parquet files
-                self.delete_parquet_files("metrics/")
-                # Move the merged file to the final location
-                self.move_file(
-                    source_key=f"tmp/merged_at_{run_id}.parquet",
-                    destination_key=f"metrics/{run_id}.parquet",
-                )
+        # Credentials are optional, boto3 falls back to its default chain
+        if self.has_s3_config():
+            # The upload runs in the background, the summary is returned right
+            # away. Uploads run one at a time so compaction sees every run.
+            self.wait_for_export()
+            executor = ThreadPoolExecutor(max_workers=1)
+            self._export_future = executor.submit(self.upload_run, run_id)
+            executor.shutdown(wait=False)
         else:
             print("No S3 bucket configured, skipping export")
 
@@ -1,16 +1,55 @@
-from pprint import pprint
-from typing import Any
-from sqlalchemy import create_engine, text
+import pandas as pd
+
+from typing import Any, List
+from sqlalchemy import column, create_engine, insert, table, text
 from sqlalchemy.engine import URL
-from sqlglot.expressions import insert, values, Select
+from sqlglot.expressions import Select
 from sqlglot.dialects import Postgres
-from typing import List, Tuple
 
+from weiser.drivers.base import cached_sql, cached_text
+from weiser.drivers.metric_stores.base import METRICS_COLUMNS, BaseMetricStore
 from weiser.loader.models import MetricStore
 
+# Pooled connections are replaced after this many seconds.
+POOL_RECYCLE_SECONDS = 1800
+
+# The run id index is created last, once it exists the whole schema does.
+SCHEMA_READY_QUERY = text("SELECT to_regclass('idx_metrics_run_id')")
+
+ASYNC_COMMIT_QUERY = text("SET LOCAL synchronous_commit = off")
+
+# Postgres types of the metrics columns.
+METRICS_COLUMN_TYPES = {
+    "actual_value": "double precision",
+    "check_id": "VARCHAR",
+    "condition": "VARCHAR",
+    "dataset": "VARCHAR",
+    "datasource": "VARCHAR",
+    "fail": "BOOLEAN",
+    "name": "VARCHAR",
+    "run_id": "VARCHAR",
+    "run_time": "TIMESTAMP",
+    "sql": "VARCHAR",
+    "success": "BOOLEAN",
+    "threshold": "VARCHAR",
+    "threshold_list": "double precision[]",
+    "type": "VARCHAR",
+}
+
+CREATE_TABLE_QUERY = text(
+    "CREATE TABLE IF NOT EXISTS metrics ({})".format(
+        ", ".join(f"{name} {METRICS_COLUMN_TYPES[name]}" for name in METRICS_COLUMNS)
+    )
+)
 
-class PostgresMetricStore:
+# A Core insert executed with a list of rows is sent as multi-row VALUES pages
+# (insertmanyvalues), not one round trip per row.
+INSERT_QUERY = insert(table("metrics", *(column(name) for name in METRICS_COLUMNS)))
+
+
+class PostgresMetricStore(BaseMetricStore):
     def __init__(self, metric_store: MetricStore) -> None:
+        super().__init__()
         self.config = metric_store
         if not metric_store.uri:
             uri = URL.create(
@@ -23,31 +62,30 @@ class PostgresMetricStore:
         else:
             uri = metric_store.uri
 
-        self.engine = create_engine(uri)
+        # Concurrent checks stay within the default pool size. Pooled
+        # connections are recycled before server or proxy idle timeouts hit.
+        self.engine = create_engine(uri, pool_recycle=POOL_RECYCLE_SECONDS)
         self.db_name = metric_store.db_name
         self.dialect = Postgres
 
-        with self.engine.connect() as conn:
-            conn.execute(
-                text(
-                    """CREATE TABLE IF NOT EXISTS metrics (
-                            actual_value double precision,
-                            check_id VARCHAR,
-                            condition VARCHAR,
-                            dataset VARCHAR,
-                            datasource VARCHAR,
-                            fail BOOLEAN,
-                            name VARCHAR,
-                            run_id VARCHAR,
-                            run_time TIMESTAMP,
-                            sql VARCHAR,
-                            success boolean,
-                            threshold VARCHAR,
-                            threshold_list double precision[],
-                            type VARCHAR
-                            )"""
+        # begin() commits on exit, a plain connect() would roll the DDL back.
+        with self.engine.begin() as conn:
+            # DDL takes catalog locks, skip it once the schema is in place.
+            if conn.scalar(SCHEMA_READY_QUERY) is None:
+                conn.execute(CREATE_TABLE_QUERY)
+                # Anomaly checks look history up by check id, exports by run id.
+                conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS idx_metrics_check_id "
+                        "ON metrics (check_id)"
+                    )
+                )
+                conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS idx_metrics_run_id "
+                        "ON metrics (run_id)"
+                    )
                 )
-            )
 
     # Meant for metadata queries, like anomaly detection
     def execute_query(
@@ -57,9 +95,10 @@ class PostgresMetricStore:
         verbose: bool = False,
         validate_results: bool = True,
     ):
+        self.flush()
         engine = self.engine
         with engine.connect() as conn:
-            rows = list(conn.execute(text(q.sql(dialect=self.dialect))))
+            rows = list(conn.execute(cached_text(cached_sql(q, self.dialect))))
             if (
                 validate_results
                 and not len(rows) > 0
@@ -74,39 +113,32 @@ class PostgresMetricStore:
                 # pprint(rows)
         return rows
 
-    def insert_results(self, record):
+    # Anomaly windows are read straight into a DataFrame
+    def execute_query_df(
+        self,
+        q: Select,
+        check: Any,
+        verbose: bool = False,
+    ) -> pd.DataFrame:
+        self.flush()
         with self.engine.connect() as conn:
-            if isinstance(record["threshold"], List) or isinstance(
-                record["threshold"], Tuple
-            ):
-                record["threshold_list"] = record["threshold"]
-                record["threshold"] = None
-            elif "threshold_list" not in record:
-                record["threshold_list"] = None
-            q = insert(
-                values(
-                    [
-                        (
-                            record["actual_value"],
-                            record["check_id"],
-                            record["condition"],
-                            record["dataset"],
-                            record["datasource"],
-                            record["fail"],
-                            record["name"],
-                            record["run_id"],
-                            record["run_time"],
-                            record["measure"],
-                            record["success"],
-                            record["threshold"],
-                            record["threshold_list"],
-                            record["type"],
-                        )
-                    ]
-                ),
-                "metrics",
+            result = conn.execute(cached_text(cached_sql(q, self.dialect)))
+            df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+        if df.empty:
+            raise Exception(
+                f"Unexpected result executing check: {check.model_dump()}"
+            )
+        return df
+
+    # Write rows in one transaction, as multi-row VALUES pages
+    def write_rows(self, rows: List[tuple]):
+        with self.engine.begin() as conn:
+            # Metrics can be recomputed, don't wait on the WAL flush. A crash
+            # can lose the last moments of commits, never corrupt them.
+            conn.execute(ASYNC_COMMIT_QUERY)
+            conn.execute(
+                INSERT_QUERY, [dict(zip(METRICS_COLUMNS, row)) for row in rows]
             )
-            conn.execute(text(q.sql(dialect="postgres")))
 
     def export_results(self, run_id):
-        pass
+        self.flush()
@@ -1,37 +1,109 @@
 import glob
+import os
 import yaml
 
+from collections import OrderedDict
+from itertools import chain
 from jinja2 import Environment, BaseLoader
 from rich.console import Console
 from rich.table import Table
 from os.path import abspath, dirname, join
 
+# libyaml's parser when PyYAML was built with it, the pure Python one otherwise.
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 console = Console()
 
+# Shared by every templated config file, built once per process.
+jinja_env = Environment(loader=BaseLoader())
+JINJA_MARKERS = ("{{", "{%", "{#")
+
+# Parsed config files kept in memory, least recently used evicted first.
+YAML_CACHE_SIZE = 100
+yaml_cache = OrderedDict()
+
+
+# Lists are extended in place, each include only copies its own items.
+def merge_list(namespace, key, value):
+    if key in namespace:
+        namespace[key].extend(value)
+    else:
+        namespace[key] = list(value)
+
+
+def merge_includes(namespace, key, value):
+    if key in namespace:  # remove duplicates
+        # dict keys dedupe in one pass and keep first seen order.
+        namespace[key] = list(dict.fromkeys(chain(namespace[key], value)))
+    else:
+        namespace[key] = list(value)
+
+
+def ignore_key(namespace, key, value):
+    pass
 
+
+NAMESPACE_MERGERS = {
+    "checks": merge_list,
+    "datasources": merge_list,
+    "connections": merge_list,
+    "includes": merge_includes,
+    "extras": ignore_key,
+}
+
+
+# Parsed files are shared with the YAML cache and never written to, the
+# namespace owns its dict and lists.
 def update_namespace(namespace, new_file, verbose):
 
     if namespace is None:
-        return new_file
+        return {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in new_file.items()
+        }
     for key, value in new_file.items():
-        if key in namespace and key in ("checks", "datasources", "connections"):
-            namespace[key] = namespace[key] + new_file[key]
-        elif key in namespace and key in ("includes"):  # remove duplicates
-            namespace[key] = list(set(namespace[key] + new_file[key]))
-        elif key in ("checks", "datasources", "includes", "connections"):
-            namespace[key] = new_file[key]
-        elif key in ("extras"):
-            pass  # ignored keys
+        merge = NAMESPACE_MERGERS.get(key)
+        if merge is not None:
+            merge(namespace, key, value)
         elif verbose:
             console.print(f"Key not supported yet: {key}")
     return namespace
 
 
+# Parse a config file, reusing the last parse while the file is unchanged.
+# The parsed dict is shared between callers and must be treated as read only.
+def load_yaml(file_path: str, context: dict = None) -> dict:
+    stat = os.stat(file_path)
+    context_key = hash(frozenset(context.items())) if context else None
+    key = (abspath(file_path), context_key)
+    cached = yaml_cache.get(key)
+    if cached is not None and cached[:2] == (stat.st_mtime, stat.st_size):
+        yaml_cache.move_to_end(key)
+        return cached[2]
+    with open(file_path, "r", encoding="utf-8") as stream:
+        if context:
+            text = stream.read()
+            # Plain YAML files skip template compilation and rendering.
+            if any(marker in text for marker in JINJA_MARKERS):
+                text = jinja_env.from_string(text).render(context)
+            data_loaded = yaml.load(text, Loader=SafeLoader)
+        else:
+            data_loaded = yaml.load(stream, Loader=SafeLoader)
+    yaml_cache[key] = (stat.st_mtime, stat.st_size, data_loaded)
+    yaml_cache.move_to_end(key)
+    if len(yaml_cache) > YAML_CACHE_SIZE:
+        yaml_cache.popitem(last=False)
+    return data_loaded
+
+
 def load_config(
     config_path: str,
     namespace: dict = None,
     context: dict = None,
-    visited_path: dict = None,
+    visited_path: set = None,
     table: Table = None,
     verbose: bool = True,
     first_run: bool = True,
@@ -42,28 +114,27 @@ def load_config(
         if verbose:
             print_final_table = True
             table = Table("File Path", "# of checks")
-        visited_path = {}
+        visited_path = set()
 
-    file_paths = glob.glob(config_path)
+    # Literal paths only need a stat, glob would list the whole directory.
+    if not glob.has_magic(config_path) and os.path.isfile(config_path):
+        file_paths = [config_path]
+    else:
+        file_paths = glob.glob(config_path)
     if verbose:
         console.print(f"Walking Paths: {file_paths}")
     for file_path in file_paths:
-        if file_path in visited_path:
+        # Relative and symlinked spellings of the same file are loaded once.
+        real_path = os.path.realpath(file_path)
+        if real_path in visited_path:
             continue
-        visited_path[file_path] = True
-        with open(file_path, "r") as stream:
-            if context:
-                data_loaded = yaml.safe_load(
-                    Environment(loader=BaseLoader())
-                    .from_string(stream.read())
-                    .render(context)
-                )
-            else:
-                data_loaded = yaml.safe_load(stream)
-            if verbose:
-                table.add_row(str(file_path), str(len(data_loaded["checks"])))
+        visited_path.add(real_path)
+        data_loaded = load_yaml(file_path, context)
+        if verbose:
+            table.add_row(str(file_path), str(len(data_loaded["checks"])))
 
         if "includes" in data_loaded:
+            root_dir = dirname(abspath(file_path))
             for included_path in data_loaded["includes"]:
                 if (
                     namespace
@@ -73,7 +144,6 @@ def load_config(
                     continue
                 if included_path.startswith("/"):
                     included_path = included_path[1:]
-                root_dir = dirname(abspath(file_path))
                 namespace = load_config(
                     join(root_dir, included_path),
                     namespace=namespace,
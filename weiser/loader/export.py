@@ -11,6 +11,22 @@ from slack_sdk.errors import SlackApiError
 
 console = Console()
 
+FAIL_ICON = ":x:"
+SUCCESS_ICON = ":white_check_mark:"
+
+# Slack section for a failed check, anomaly checks have no fixed threshold.
+ANOMALY_FAILURE_TEMPLATE = (
+    "{0}. *{name}* ({check_id:.10})\n"
+    "   • Dataset: {dataset}  at Data Source: {datasource}\n"
+    "   • Actual Value: {actual_value}\n"
+    "   • Type: {type}\n"
+)
+FAILURE_TEMPLATE = (
+    ANOMALY_FAILURE_TEMPLATE
+    + "   • Condition: {condition}\n"
+    + "   • Threshold: {threshold}\n"
+)
+
 
 def export_results(
     run_id: str,
@@ -60,19 +76,20 @@ def export_results(
             # Add failure details if any
             if results['failures']:
                 blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": "*Failed Checks Details:*"}})
-                for i, failure in enumerate(results['failures'], 1):
-                    block = (
-                        f"{i}. *{failure['name']}* ({failure['check_id'][:10]})\n"
-                        f"   • Dataset: {failure['dataset']}  at Data Source: {failure['datasource']}\n"
-                        f"   • Actual Value: {failure['actual_value']}\n"
-                        f"   • Type: {failure['type']}\n"
-                    )
-                    if failure['type'] != 'anomaly':
-                        block += (
-                            f"   • Condition: {failure['condition']}\n"
-                            f"   • Threshold: {failure['threshold']}\n"
-                        )
-                    blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": block}})
+                blocks.extend(
+                    {
+                        "type": "section",
+                        "text": {
+                            "type": "mrkdwn",
+                            "text": (
+                                ANOMALY_FAILURE_TEMPLATE
+                                if failure['type'] == 'anomaly'
+                                else FAILURE_TEMPLATE
+                            ).format(i, **failure),
+                        },
+                    }
+                    for i, failure in enumerate(results['failures'], 1)
+                )
             
             # Send message to Slack
             response = client.send(
@@ -108,21 +125,20 @@ def print_results(results, show_ids: bool):
     table = Table(*columns)
     for results_item in results:
         for result in results_item["results"]:
-            row = [
-                result.get("name"),
-                result.get("datasource"),
-                result.get("dataset"),
-                result.get("measure") or result.get("type"),
-                result.get("condition"),
-                str(result.get("actual_value")),
-                str(
-                    result.get("threshold_list")
-                    if result.get("threshold") is None
-                    else result.get("threshold")
-                ),
-                ":x:" if result.get("fail") else ":white_check_mark:",
-            ]
+            get = result.get
+            threshold = get("threshold")
+            row = (
+                get("name"),
+                get("datasource"),
+                get("dataset"),
+                get("measure") or get("type"),
+                get("condition"),
+                str(get("actual_value")),
+                str(get("threshold_list") if threshold is None else threshold),
+                FAIL_ICON if get("fail") else SUCCESS_ICON,
+            )
             if show_ids:
-                row = [result.get("check_id")] + row
-            table.add_row(*row)
+                table.add_row(get("check_id"), *row)
+            else:
+                table.add_row(*row)
     console.print(table)
@@ -3,7 +3,7 @@ from decimal import Decimal
 from enum import Enum, IntEnum
 from typing import Optional, Union, List
 
-from pydantic import BaseModel, SecretStr
+from pydantic import BaseModel, ConfigDict, SecretStr, field_validator
 
 
 class Version(IntEnum):
@@ -72,9 +72,11 @@ class TimeDimension(BaseModel):
     granularity: Optional[Granularity] = Granularity.day
 
 
+# Config models are read only once validated, runners keep derived values
+# in locals instead of writing them back.
 class Check(BaseModel):
     name: str
-    datasource: Optional[Union[str, List[str]]] = "default"
+    datasource: List[str] = ["default"]
     type: Optional[CheckType] = CheckType.numeric
     dataset: Union[str, List[str]]
 
@@ -86,14 +88,18 @@ class Check(BaseModel):
         Union[Union[int, float, Decimal], List[Union[int, float, Decimal]]]
     ] = None
     dimensions: List[str] = []
-    filter: List[str] = []
     time_dimension: Optional[TimeDimension] = None
     filter: Optional[str] = None
     # Used for metadata checks
     check_id: str = None
 
-    class Config:
-        use_enum_values = True
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
+
+    # A single datasource is accepted as a plain string
+    @field_validator("datasource", mode="before")
+    @classmethod
+    def datasource_list(cls, value: Union[str, List[str]]) -> List[str]:
+        return [value] if isinstance(value, str) else value
 
 
 class Datasource(BaseModel):
@@ -107,8 +113,7 @@ class Datasource(BaseModel):
     password: Optional[SecretStr] = None
     port: Optional[int] = None
 
-    class Config:
-        use_enum_values = True
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
 
 
 class MetricStore(BaseModel):
@@ -128,8 +133,7 @@ class MetricStore(BaseModel):
     s3_region: Optional[str] = "us-east-1"
     s3_url_style: Optional[str] = S3UrlStyle.vhost
 
-    class Config:
-        use_enum_values = True
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
 
 
 class BaseConfig(BaseModel):
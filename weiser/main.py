@@ -6,10 +6,7 @@ from dotenv import load_dotenv
 from rich import print
 from typing_extensions import Annotated
 
-
-from weiser.loader.export import export_results, print_results
 from weiser.loader.config import load_config
-from weiser.runner import pre_run_config, run_checks, generate_sample_data
 
 
 # Initialize Typer
@@ -41,10 +38,18 @@ def run(
     skip_export: Annotated[
         bool, typer.Option("--skip-export", "-s", help="Skip exporting results")
     ] = False,
+    sequential: Annotated[
+        bool, typer.Option("--sequential", help="Run checks one at a time")
+    ] = False,
 ):
     """
     Main Command
     """
+    # Runner and export pull in the drivers, checks and Slack, only the
+    # commands that use them import them.
+    from weiser.loader.export import export_results, print_results
+    from weiser.runner import pre_run_config, run_checks
+
     # Load .env
     if os.path.exists(".env"):
         if verbose:
@@ -53,8 +58,8 @@ def run(
             dotenv_path=".env",
             verbose=verbose,
         )
-    env_variables = dict(os.environ)
-    config = load_config(input_config, context=env_variables)
+    # os.environ is already a mapping, templates read it without a copy.
+    config = load_config(input_config, context=os.environ)
     context = pre_run_config(config, verbose=verbose)
     results = run_checks(
         context["run_id"],
@@ -62,6 +67,7 @@ def run(
         context["connections"],
         context["metric_store"],
         verbose,
+        not sequential,
     )
     if not skip_export:
         export_results(
@@ -71,6 +77,8 @@ def run(
             run_ts=context["run_ts"],
             verbose=verbose,
         )
+        # Uploads run in the background, a failed one must fail the run.
+        context["metric_store"].wait_for_export()
     print_results(results, show_ids)
     print(
         f"[{context['run_ts'].strftime('%Y-%m-%d %H:%M:%S')}] [green]Finished Run[/green] :rocket:"
@@ -87,6 +95,8 @@ def compile(
     """
     Main Command
     """
+    from weiser.runner import pre_run_config
+
     # Load .env
     if os.path.exists(".env"):
         load_dotenv(
@@ -114,6 +124,9 @@ def sample(
     """
     Generate sample data based on a check id name.
     """
+    from weiser.loader.export import export_results
+    from weiser.runner import pre_run_config, generate_sample_data
+
     # Load .env
     if os.path.exists(".env"):
         load_dotenv(
@@ -1,16 +1,42 @@
-import json
-import random
+import numpy as np
 import uuid
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime, timedelta
+from typing import List
 from rich.progress import Progress
 from sqlalchemy import text
 
 from weiser.checks import CheckFactory
-from weiser.loader.models import BaseConfig, ConnectionType, Condition
-from weiser.drivers import DriverFactory
+from weiser.loader.models import (
+    BaseConfig,
+    Check,
+    CheckType,
+    ConnectionType,
+    Condition,
+)
+from weiser.drivers import BaseDriver, DriverFactory
 from weiser.drivers.metric_stores import MetricStoreFactory, MetricStoreDB
 
+# Checks run concurrently, matching SQLAlchemy's default pool size so workers
+# never wait on a connection.
+CHECK_MAX_WORKERS = 5
+
+# Days of history generated by generate_sample_data.
+SAMPLE_DAYS = 30
+
+# Every unknown datasource is reported at once, before any check runs
+def validate_datasources(checks: List[Check], connections: dict):
+    missing = [
+        f"Check <{check.name}>: Datasource {datasource} is not configured. "
+        for check in checks
+        for datasource in check.datasource
+        if datasource not in connections
+    ]
+    if missing:
+        raise Exception("\n".join(missing))
+
 
 def run_checks(
     run_id: str,
@@ -18,34 +44,59 @@ def run_checks(
     connections: dict,
     metric_store: MetricStoreDB,
     verbose=False,
+    parallel=True,
 ):
-    results = []
     checks = []
-    with Progress(transient=False) as progress:
+    validate_datasources(config.checks, connections)
+    # The progress bar is only shown in verbose runs, otherwise its refresh
+    # thread is never started.
+    with Progress(transient=False) if verbose else nullcontext() as progress:
         for check in config.checks:
-            if isinstance(check.datasource, str):
-                check.datasource = [check.datasource]
             for datasource in check.datasource:
-                if datasource not in connections:
-                    raise Exception(
-                        f"Check <{check.name}>: Datasource {datasource} is not configured. "
-                    )
-                driver = connections[datasource]
                 check_instance = CheckFactory.create_check(
-                    run_id, check, driver, datasource, metric_store
+                    run_id, check, connections[datasource], datasource, metric_store
                 )
                 checks.append(check_instance)
         if verbose:
             task = progress.add_task(f"[cyan]Running checks", total=len(checks) * 10)
-        for check_instance in checks:
-            result = {
-                "check_instance": check_instance.check.name,
-                "results": check_instance.run(verbose),
-                "run_id": run_id,
-            }
-            if verbose:
-                progress.update(task, advance=10)
-            results.append(result)
+        try:
+            # Anomaly checks read the metrics the others write, so they start
+            # once the rest of the run is done, with or without concurrency.
+            stages = (
+                [c for c in checks if c.check.type != CheckType.anomaly],
+                [c for c in checks if c.check.type == CheckType.anomaly],
+            )
+            outcomes = {}
+            for stage in stages:
+                if parallel:
+                    # Checks are independent round trips to their data sources.
+                    with ThreadPoolExecutor(max_workers=CHECK_MAX_WORKERS) as pool:
+                        futures = {
+                            pool.submit(check_instance.run, verbose): check_instance
+                            for check_instance in stage
+                        }
+                        for future in as_completed(futures):
+                            outcomes[futures[future]] = future.result()
+                            if verbose:
+                                progress.update(task, advance=10)
+                else:
+                    for check_instance in stage:
+                        outcomes[check_instance] = check_instance.run(verbose)
+                        if verbose:
+                            progress.update(task, advance=10)
+            # Results are reported in config order, not completion order.
+            check_results = [outcomes[check_instance] for check_instance in checks]
+            results = [
+                {
+                    "check_instance": check_instance.check.name,
+                    "results": check_result,
+                    "run_id": run_id,
+                }
+                for check_instance, check_result in zip(checks, check_results)
+            ]
+        finally:
+            # Persist any metrics still buffered by the metric store
+            metric_store.flush()
     return results
 
 
@@ -56,69 +107,64 @@ def generate_sample_data(
     metric_store: MetricStoreDB,
     verbose=False,
 ):
-    start_date = datetime.now() - timedelta(days=30)
-    end_date = datetime.now()
+    # One sample a day over the last 30 days, today included.
+    now = datetime.now()
+    days = [now - timedelta(days=SAMPLE_DAYS - i) for i in range(SAMPLE_DAYS + 1)]
+    rng = np.random.default_rng()
     results = []
     for check in config.checks:
         if check_name == check.name:
-            if isinstance(check.datasource, str):
-                check.datasource = [check.datasource]
-            for i in range((end_date - start_date).days + 1):
-                dt = start_date + timedelta(days=i)
+            validate_datasources([check], connections)
+            datasources = check.datasource
+            datasets = check.dataset
+            if isinstance(datasets, str):
+                datasets = [datasets]
+            threshold = check.threshold
+            if check.condition == Condition.between:
+                delta = int((threshold[1] - threshold[0]) / 2)
+                low, high = threshold[0] - delta, threshold[1] + delta
+            else:
+                delta = int(threshold / 2)
+                low, high = threshold - delta, threshold + delta
+            # Values for every day, datasource and dataset are drawn in one call,
+            # both bounds included like random.randint's.
+            values = rng.integers(
+                low,
+                high,
+                size=(len(days), len(datasources), len(datasets)),
+                endpoint=True,
+            ).tolist()
+            for dt, day_values in zip(days, values):
                 run_id = str(uuid.uuid4())
 
-                for datasource in check.datasource:
-                    if datasource not in connections:
-                        raise Exception(
-                            f"Check <{check.name}>: Datasource {datasource} is not configured. "
-                        )
+                for datasource, datasource_values in zip(datasources, day_values):
                     driver = connections[datasource]
-
                     check_instance = CheckFactory.create_check(
                         run_id, check, driver, datasource, metric_store
                     )
-                    datasets = check_instance.check.dataset
-                    results = []
-                    if isinstance(datasets, str):
-                        datasets = [datasets]
-                    for dataset in datasets:
-                        if check_instance.check.condition == Condition.between:
-                            delta = int(
-                                (
-                                    check_instance.check.threshold[1]
-                                    - check_instance.check.threshold[0]
-                                )
-                                / 2
-                            )
-                            value = random.randint(
-                                check_instance.check.threshold[0] - delta,
-                                check_instance.check.threshold[1] + delta,
-                            )
-                        else:
-                            delta = int(check_instance.check.threshold / 2)
-                            value = random.randint(
-                                check_instance.check.threshold - delta,
-                                check_instance.check.threshold + delta,
-                            )
+                    sample_results = []
+                    for dataset, value in zip(datasets, datasource_values):
                         success = check_instance.apply_condition(value)
                         check_instance.append_result(
-                            success, value, results, dataset, dt, verbose
-                        )
-
-                        results.append(
-                            {
-                                "check_instance": check_instance,
-                                "results": check_instance.run(verbose),
-                                "run_id": run_id,
-                            }
+                            success, value, sample_results, dataset, dt, verbose
                         )
+                    results.append(
+                        {
+                            "check_instance": check.name,
+                            "results": sample_results,
+                            "run_id": run_id,
+                        }
+                    )
+    metric_store.flush()
     return results
 
 
 def pre_run_config(
     config: dict, compile_only: bool = False, verbose: bool = False
 ) -> dict:
-    base_config = BaseConfig(**config)
+    # One pass of the compiled validator over the whole tree, nested checks
+    # and datasources included.
+    base_config = BaseConfig.model_validate(config)
     metric_store = None
     if base_config.connections:
         for config_conn in base_config.connections:
@@ -128,23 +174,32 @@ def pre_run_config(
     context = {
         "config": base_config,
         "connections": {},
-        "metric_store": MetricStoreFactory.create_driver(metric_store),
+        "metric_store": None,
         "run_id": str(uuid.uuid4()),
         "run_ts": datetime.now(),
     }
     if verbose:
         pass
-        # pprint(json.loads(base_config.model_dump_json()))
+        # pprint(base_config.model_dump())
     if compile_only:
         return context
-    for connection in base_config.datasources:
-        context["connections"][connection.name] = DriverFactory.create_driver(
-            connection
-        )
-        engine = context["connections"][connection.name].engine
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-            if verbose:
-                # pprint(f"Connected to {connection.name}")
-                pass
+    # Without a configured metric store results go to the default local
+    # DuckDB file.
+    context["metric_store"] = MetricStoreFactory.create_driver(metric_store)
+    context["connections"] = DriverFactory.create_drivers(base_config.datasources)
+    # Connectivity is tested up front, one round trip per datasource, all of
+    # them in flight at once.
+    drivers = list(context["connections"].values())
+    if drivers:
+        with ThreadPoolExecutor(max_workers=len(drivers)) as pool:
+            for future in [pool.submit(ping, driver) for driver in drivers]:
+                future.result()
+    if verbose:
+        # pprint(f"Connected to {list(context['connections'])}")
+        pass
     return context
+
+
+def ping(driver: BaseDriver) -> None:
+    with driver.engine.connect() as conn:
+        conn.execute(text("SELECT 1"))